@@ -15,6 +15,10 @@
 #   ./build.sh              Build zip in the repo root directory
 #   ./build.sh --deploy     Build zip and copy it to the FS25 mods folder
 #   ./build.sh -d           Short form of --deploy
+#   ./build.sh --level N    DEFLATE level 0-9 (default 6; 0 = store only)
+#   ./build.sh --no-compress-assets
+#                           Store already-compressed assets (PNG/JPEG images,
+#                           audio, i3d shapes) instead of deflating them again
 #
 # Deploy auto-detects the FS25 mods folder by checking common locations:
 #   Windows:  %USERPROFILE%\Documents\My Games\FarmingSimulator2025\mods
@@ -32,21 +36,46 @@ set -e
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 ZIP_NAME="FS25_NPCFavor.zip"
 OUTPUT="$SCRIPT_DIR/$ZIP_NAME"
+# The zip is written here and renamed over $OUTPUT only once it is complete,
+# so an interrupted or failed build never leaves a partial zip to deploy.
+TMP_OUTPUT="${OUTPUT%.zip}.tmp.zip"
 DEPLOY=false
+LEVEL=6
+COMPRESS_ASSETS=true
 
 # ---- Parse arguments --------------------------------------------------------
 
-for arg in "$@"; do
-    case "$arg" in
+usage() {
+    echo "Usage: ./build.sh [--deploy] [--level N] [--no-compress-assets]"
+    exit 1
+}
+
+while [ $# -gt 0 ]; do
+    case "$1" in
         --deploy|-d) DEPLOY=true ;;
+        --level|-l)
+            [ $# -ge 2 ] || usage
+            LEVEL="$2"
+            shift
+            ;;
+        --level=*) LEVEL="${1#--level=}" ;;
+        --no-compress-assets) COMPRESS_ASSETS=false ;;
         *)
-            echo "Unknown option: $arg"
-            echo "Usage: ./build.sh [--deploy]"
-            exit 1
+            echo "Unknown option: $1"
+            usage
             ;;
     esac
+    shift
 done
 
+case "$LEVEL" in
+    [0-9]) ;;
+    *)
+        echo "ERROR: --level must be a single digit 0-9 (got '$LEVEL')"
+        exit 1
+        ;;
+esac
+
 # ---- Detect OS --------------------------------------------------------------
 
 IS_WINDOWS=false
@@ -54,22 +83,69 @@ case "$(uname -s)" in
     MINGW*|MSYS*|CYGWIN*) IS_WINDOWS=true ;;
 esac
 
+# ---- Exclusions -------------------------------------------------------------
+# Dev-only files that are not part of the mod. Excluded directories are pruned
+# while walking the tree, so nothing beneath them (e.g. .git objects) is ever
+# enumerated. Names are matched at any depth; shell globs are allowed.
+# find_unused_code.sh prunes exactly EXCLUDE_DIRS too — keep the lists identical.
+
+EXCLUDE_DIRS=('.git*' .claude .vscode .idea node_modules)
+EXCLUDE_FILES=('.git*' build.sh find_unused_code.sh CLAUDE.md Thumbs.db .DS_Store nul '*~')
+EXCLUDE_EXTS=(zip swp swo)
+
+# Formats that are already compressed; with --no-compress-assets these are
+# stored as-is since DEFLATE costs full CPU time for little or no size gain.
+INCOMPRESSIBLE_EXTS=(png ogg mp3 jpg jpeg gdm shapes)
+
+# Print the relative path of every file that belongs in the zip, one per line.
+# Both platforms archive exactly this list, so there is one exclusion list to
+# maintain instead of a zip -x list and a PowerShell filter kept in sync.
+collect_files() {
+    local prune=() skip=() p
+    for p in "${EXCLUDE_DIRS[@]}";  do prune+=(-o -name "$p"); done
+    for p in "${EXCLUDE_FILES[@]}"; do skip+=(-o -name "$p"); done
+    for p in "${EXCLUDE_EXTS[@]}";  do skip+=(-o -name "*.$p"); done
+
+    find . -mindepth 1 \
+        -type d \( "${prune[@]:1}" \) -prune -o \
+        -type f ! \( "${skip[@]:1}" \) -print \
+        | sed 's|^\./||' | LC_ALL=C sort
+}
+
 # ---- Build ------------------------------------------------------------------
-# Files excluded from the zip (dev-only, not part of the mod):
-#   Directories: .git, .claude, .vscode, .idea, node_modules
-#   Files:       build.sh, find_unused_code.sh, CLAUDE.md, .gitignore, nul
-#   Extensions:  .zip, .swp, .swo
-#   OS junk:     Thumbs.db, .DS_Store
 
-rm -f "$OUTPUT"
 cd "$SCRIPT_DIR"
 
+FILE_LIST=$(mktemp)
+trap 'rm -f "$FILE_LIST" "$TMP_OUTPUT"' EXIT
+rm -f "$TMP_OUTPUT"
+collect_files > "$FILE_LIST"
+
+if [ ! -s "$FILE_LIST" ]; then
+    echo "ERROR: no files found to archive"
+    exit 1
+fi
+
 if [ "$IS_WINDOWS" = true ]; then
     # PowerShell + .NET System.IO.Compression (ships with every Win10/11).
     # We use the .NET ZipFile API directly because PowerShell's Compress-Archive
     # cmdlet flattens directory structure — which breaks the mod.
     WIN_SCRIPT_DIR=$(cygpath -w "$SCRIPT_DIR")
-    WIN_OUTPUT=$(cygpath -w "$OUTPUT")
+    WIN_OUTPUT=$(cygpath -w "$TMP_OUTPUT")
+    WIN_FILE_LIST=$(cygpath -w "$FILE_LIST")
+
+    # .NET only exposes three compression levels; map the zip-style digit.
+    case "$LEVEL" in
+        0)       WIN_LEVEL=NoCompression ;;
+        [1-5])   WIN_LEVEL=Fastest ;;
+        *)       WIN_LEVEL=Optimal ;;
+    esac
+
+    WIN_STORE_EXTS=""
+    if [ "$COMPRESS_ASSETS" = false ]; then
+        WIN_STORE_EXTS=$(printf "'.%s'," "${INCOMPRESSIBLE_EXTS[@]}")
+        WIN_STORE_EXTS="${WIN_STORE_EXTS%,}"
+    fi
 
     powershell.exe -NoProfile -Command "
         \$ErrorActionPreference = 'Stop'
@@ -79,43 +155,40 @@ if [ "$IS_WINDOWS" = true ]; then
         \$source = '${WIN_SCRIPT_DIR}'
         \$dest   = '${WIN_OUTPUT}'
 
-        # Exclusion lists — keep in sync with the zip command below
-        \$excludeDirs  = @('.git', '.claude', '.vscode', '.idea', 'node_modules')
-        \$excludeFiles = @('build.sh', 'find_unused_code.sh', 'CLAUDE.md',
-                           'Thumbs.db', '.DS_Store', '.gitignore', 'nul')
-        \$excludeExts  = @('.zip', '.swp', '.swo')
-
-        # Gather files, applying exclusions
-        \$files = Get-ChildItem -Path \$source -Recurse -File | Where-Object {
-            \$rel   = \$_.FullName.Substring(\$source.Length + 1)
-            \$parts = \$rel -split '[/\\\\]'
-            \$skip  = \$false
-            foreach (\$d in \$excludeDirs) {
-                if (\$parts[0] -eq \$d) { \$skip = \$true; break }
-            }
-            if (-not \$skip -and \$_.Name -in \$excludeFiles) { \$skip = \$true }
-            if (-not \$skip) {
-                foreach (\$ext in \$excludeExts) {
-                    if (\$_.Extension -eq \$ext) { \$skip = \$true; break }
-                }
-            }
-            -not \$skip
-        }
+        # Relative paths (forward slashes) produced by collect_files
+        \$files = Get-Content -LiteralPath '${WIN_FILE_LIST}' -Encoding UTF8
 
-        if (\$files.Count -eq 0) {
-            Write-Error 'No files found to archive'
-            exit 1
-        }
+        \$level      = [System.IO.Compression.CompressionLevel]::${WIN_LEVEL}
+        \$storeExts  = @(${WIN_STORE_EXTS})
+        \$bufferSize = 256KB
 
         # Create zip with correct relative paths (no wrapper folder)
         \$zip = [System.IO.Compression.ZipFile]::Open(
             \$dest, [System.IO.Compression.ZipArchiveMode]::Create)
         try {
-            foreach (\$f in \$files) {
-                \$rel = \$f.FullName.Substring(\$source.Length + 1) -replace '\\\\', '/'
-                [System.IO.Compression.ZipFileExtensions]::CreateEntryFromFile(
-                    \$zip, \$f.FullName, \$rel,
-                    [System.IO.Compression.CompressionLevel]::Optimal) | Out-Null
+            foreach (\$rel in \$files) {
+                \$entryLevel = \$level
+                if (\$storeExts -contains [System.IO.Path]::GetExtension(\$rel).ToLower()) {
+                    \$entryLevel = [System.IO.Compression.CompressionLevel]::NoCompression
+                }
+                # Stream each file into its entry with a 256 KiB buffer rather
+                # than CreateEntryFromFile's small default copy buffer.
+                \$path  = Join-Path \$source \$rel
+                \$entry = \$zip.CreateEntry(\$rel, \$entryLevel)
+                # Same clamp CreateEntryFromFile applies: zip (DOS) timestamps only
+                # cover 1980-2107 and the LastWriteTime setter throws outside it.
+                \$mtime = [System.IO.File]::GetLastWriteTime(\$path)
+                if (\$mtime.Year -lt 1980 -or \$mtime.Year -gt 2107) {
+                    \$mtime = New-Object DateTime 1980, 1, 1, 0, 0, 0
+                }
+                \$entry.LastWriteTime = \$mtime
+                \$in = [System.IO.File]::OpenRead(\$path)
+                try {
+                    \$out = \$entry.Open()
+                    try { \$in.CopyTo(\$out, \$bufferSize) } finally { \$out.Dispose() }
+                } finally {
+                    \$in.Dispose()
+                }
             }
         } finally {
             \$zip.Dispose()
@@ -130,57 +203,71 @@ else
         exit 1
     fi
 
-    # Exclusion list — keep in sync with the PowerShell exclusions above
-    zip -r "$OUTPUT" . \
-        -x ".git/*"            \
-        -x ".git*"             \
-        -x ".claude/*"         \
-        -x ".vscode/*"         \
-        -x ".idea/*"           \
-        -x "node_modules/*"    \
-        -x "*.zip"             \
-        -x "build.sh"          \
-        -x "find_unused_code.sh" \
-        -x "CLAUDE.md"         \
-        -x "*.swp"             \
-        -x "*.swo"             \
-        -x "*~"                \
-        -x "Thumbs.db"         \
-        -x ".DS_Store"         \
-        -x "nul"
+    STORE_ARGS=()
+    if [ "$COMPRESS_ASSETS" = false ]; then
+        STORE_SUFFIXES=$(printf '.%s:' "${INCOMPRESSIBLE_EXTS[@]}")
+        # No trailing ':' — zip reads an empty suffix as "match every file"
+        STORE_ARGS=(-n "${STORE_SUFFIXES%:}")
+    fi
+
+    # -X omits the per-entry uid/gid and extended-timestamp extra fields, which
+    # shrinks every local and central directory record; with the sorted list
+    # from collect_files the archive layout is the same on every build.
+    zip -X "-$LEVEL" ${STORE_ARGS[@]+"${STORE_ARGS[@]}"} "$TMP_OUTPUT" -@ < "$FILE_LIST"
 fi
 
 # ---- Verify -----------------------------------------------------------------
 
-if [ ! -f "$OUTPUT" ]; then
+if [ ! -s "$TMP_OUTPUT" ]; then
     echo "ERROR: zip not created"
     exit 1
 fi
 
+mv -f "$TMP_OUTPUT" "$OUTPUT"
+
 SIZE=$(wc -c < "$OUTPUT" | tr -d ' ')
 echo "Built: $ZIP_NAME ($SIZE bytes)"
 
 # ---- Deploy (optional) ------------------------------------------------------
 
+# Print the first of the given paths that is an existing directory, in the
+# order given. All paths are probed concurrently, so network-backed homes
+# (OneDrive, SMB) cost one stat round-trip in total instead of one per path.
+first_existing_dir() {
+    local probe p i=0
+    probe=$(mktemp -d)
+    for p in "$@"; do
+        ( [ -d "$p" ] && touch "$probe/$i" ) &
+        i=$((i + 1))
+    done
+    wait
+
+    i=0
+    for p in "$@"; do
+        if [ -e "$probe/$i" ]; then
+            echo "$p"
+            break
+        fi
+        i=$((i + 1))
+    done
+    rm -rf "$probe"
+}
+
 if [ "$DEPLOY" = true ]; then
     # Auto-detect FS25 mods folder if not set via environment variable
     if [ -z "$FS25_MODS_DIR" ]; then
         if [ "$IS_WINDOWS" = true ]; then
             WIN_HOME=$(cmd.exe //c "echo %USERPROFILE%" 2>/dev/null | tr -d '\r')
-            for p in \
+            FS25_MODS_DIR=$(first_existing_dir \
                 "$WIN_HOME/OneDrive/Documents/My Games/FarmingSimulator2025/mods" \
                 "$WIN_HOME/Documents/My Games/FarmingSimulator2025/mods" \
-                "$WIN_HOME/My Documents/My Games/FarmingSimulator2025/mods"; do
-                [ -d "$p" ] && FS25_MODS_DIR="$p" && break
-            done
+                "$WIN_HOME/My Documents/My Games/FarmingSimulator2025/mods")
         else
-            for p in \
+            FS25_MODS_DIR=$(first_existing_dir \
                 "$HOME/Library/Application Support/FarmingSimulator2025/mods" \
                 "$HOME/Library/Containers/com.focus-home.farmingsimulator2025/Data/Documents/FarmingSimulator2025/mods" \
                 "$HOME/.local/share/FarmingSimulator2025/mods" \
-                "$HOME/Documents/My Games/FarmingSimulator2025/mods"; do
-                [ -d "$p" ] && FS25_MODS_DIR="$p" && break
-            done
+                "$HOME/Documents/My Games/FarmingSimulator2025/mods")
         fi
     fi
 
@@ -193,6 +280,11 @@ if [ "$DEPLOY" = true ]; then
         exit 1
     fi
 
-    cp "$OUTPUT" "$FS25_MODS_DIR/$ZIP_NAME"
-    echo "Deployed: $FS25_MODS_DIR/$ZIP_NAME"
+    # Prefer a copy-on-write clone (GNU cp --reflink on btrfs/XFS, which also
+    # uses copy_file_range; cp -c / clonefile on APFS), else a plain copy.
+    DEST="$FS25_MODS_DIR/$ZIP_NAME"
+    cp --reflink=auto "$OUTPUT" "$DEST" 2>/dev/null \
+        || cp -c "$OUTPUT" "$DEST" 2>/dev/null \
+        || cp "$OUTPUT" "$DEST"
+    echo "Deployed: $DEST"
 fi
@@ -10,12 +10,30 @@
 
 set -uo pipefail
 
+# Treat sources as raw bytes: inventory names are ASCII identifiers, so the
+# C locale gives identical matches without multibyte decoding overhead.
+export LC_ALL=C
+
 MOD_ROOT="${1:-$(cd "$(dirname "$0")" && pwd)}"
+# Drop trailing slashes: find prints single-slash paths, so "$MOD_ROOT/..."
+# prefixes (src/ filter, relative paths) only match a normalized root
+while [ "${#MOD_ROOT}" -gt 1 ] && [ "${MOD_ROOT%/}" != "$MOD_ROOT" ]; do
+    MOD_ROOT="${MOD_ROOT%/}"
+done
 MAIN_LUA="$MOD_ROOT/main.lua"
 TMPDIR=$(mktemp -d)
 
-# Collect all Lua files
-find "$MOD_ROOT" -name '*.lua' -not -path '*/.git/*' | sort > "$TMPDIR/all_lua_files.txt"
+# Directories never scanned, pruned during the walk so nothing beneath them is
+# enumerated. This is the same list build.sh leaves out of the zip, matched by
+# name at any depth, so everything that ships is scanned. Must stay identical
+# to EXCLUDE_DIRS in build.sh.
+EXCLUDE_DIRS=('.git*' .claude .vscode .idea node_modules)
+PRUNE=()
+for d in "${EXCLUDE_DIRS[@]}"; do PRUNE+=(-o -name "$d"); done
+PRUNE=(-type d \( "${PRUNE[@]:1}" \) -prune -o)
+
+# Collect all Lua files (-mindepth 1 so the root itself is never pruned)
+find "$MOD_ROOT" -mindepth 1 "${PRUNE[@]}" -name '*.lua' -print | sort > "$TMPDIR/all_lua_files.txt"
 SRC_COUNT=$(wc -l < "$TMPDIR/all_lua_files.txt")
 
 echo "=========================================="
@@ -31,71 +49,101 @@ echo ""
 echo "== PHASE 1: Building inventory =="
 echo ""
 
-# --- 1a: Classes (CapitalWord = {} or CapitalWord = ... at file scope) ---
-echo -n "" > "$TMPDIR/classes.txt"
-while IFS= read -r file; do
-    rel=$(echo "$file" | sed "s|$MOD_ROOT/||")
-    grep -n '^[A-Z][A-Za-z0-9_]* *=' "$file" 2>/dev/null | while IFS= read -r line; do
-        name=$(echo "$line" | sed 's/^\([0-9]*\):\([A-Z][A-Za-z0-9_]*\).*/\2/')
-        lineno=$(echo "$line" | cut -d: -f1)
-        # Skip metatables
-        case "$name" in *_mt) continue ;; esac
-        echo "$name|$rel:$lineno|$file" >> "$TMPDIR/classes.txt"
-    done
-done < "$TMPDIR/all_lua_files.txt"
-# Deduplicate by name (keep first occurrence)
+# --- 1a: Classes, functions and g_* globals (one pass per file) ---
+# Each line is dispatched on its first character, so every file is read once
+# and each line is tested against at most one pattern:
+#   classes.txt    name|rel:line|file         CapitalWord = ... (not *_mt)
+#   functions.txt  class|method|rel:line|file function Class:method / Class.method
+#   globals.txt    name|rel:line|file         g_name = ...
+INVENTORY_AWK='
+    {
+        file = $0
+        rel = file
+        if (index(file, root) == 1) rel = substr(file, length(root) + 1)
+        lineno = 0
+        while ((getline line < file) > 0) {
+            lineno++
+            c = substr(line, 1, 1)
+            if (c == "g" && match(line, /^g_[A-Za-z0-9_]* *=/)) {
+                match(line, /^g_[A-Za-z0-9_]*/)
+                print substr(line, 1, RLENGTH) "|" rel ":" lineno "|" file > (out ".globals.txt")
+            } else if (c ~ /[A-Z]/ && match(line, /^[A-Z][A-Za-z0-9_]* *=/)) {
+                match(line, /^[A-Z][A-Za-z0-9_]*/)
+                name = substr(line, 1, RLENGTH)
+                if (name !~ /_mt$/)
+                    print name "|" rel ":" lineno "|" file > (out ".classes.txt")
+            } else if (c == "f" && substr(line, 1, 9) == "function ") {
+                sig = substr(line, 10)
+                class = ""
+                if ((p = index(sig, ":")) > 0 || (p = index(sig, ".")) > 0) {
+                    class = substr(sig, 1, p - 1)
+                    rest = substr(sig, p + 1)
+                    if (match(rest, /^[A-Za-z_][A-Za-z0-9_]*/))
+                        method = substr(rest, 1, RLENGTH)
+                    else
+                        method = sig
+                } else if (match(sig, /[A-Za-z_][A-Za-z0-9_]*/)) {
+                    # Standalone function
+                    method = substr(sig, 1, RSTART + RLENGTH - 1)
+                } else {
+                    method = sig
+                }
+                if (method != "")
+                    print class "|" method "|" rel ":" lineno "|" file > (out ".functions.txt")
+            }
+        }
+        close(file)
+    }
+'
+
+# The file list is split into one contiguous chunk per CPU and the chunks are
+# scanned concurrently; concatenating the per-chunk results in chunk order
+# keeps the inventory in the same file/line order as a serial scan.
+JOBS=$(getconf _NPROCESSORS_ONLN 2>/dev/null || echo 1)
+mkdir "$TMPDIR/inv"
+awk -v jobs="$JOBS" -v total="$SRC_COUNT" -v out="$TMPDIR/inv" '
+    { print > (out "/" int((NR - 1) * jobs / total) ".list") }
+' "$TMPDIR/all_lua_files.txt"
+
+for ((k = 0; k < JOBS; k++)); do
+    [ -f "$TMPDIR/inv/$k.list" ] || continue
+    awk -v root="$MOD_ROOT/" -v out="$TMPDIR/inv/$k" "$INVENTORY_AWK" "$TMPDIR/inv/$k.list" &
+done
+wait
+
+for kind in classes functions globals; do
+    for ((k = 0; k < JOBS; k++)); do
+        [ -f "$TMPDIR/inv/$k.$kind.txt" ] && cat "$TMPDIR/inv/$k.$kind.txt"
+    done > "$TMPDIR/$kind.txt"
+done
+
+# Deduplicate classes by name (keep first occurrence)
 sort -t'|' -k1,1 -u "$TMPDIR/classes.txt" > "$TMPDIR/classes_uniq.txt"
 CLASS_COUNT=$(wc -l < "$TMPDIR/classes_uniq.txt")
 echo "  Classes/globals found: $CLASS_COUNT"
 
-# --- 1b: Functions (function ClassName:method or function ClassName.method) ---
-echo -n "" > "$TMPDIR/functions.txt"
-while IFS= read -r file; do
-    rel=$(echo "$file" | sed "s|$MOD_ROOT/||")
-    grep -n '^function ' "$file" 2>/dev/null | while IFS= read -r line; do
-        lineno=$(echo "$line" | cut -d: -f1)
-        sig=$(echo "$line" | cut -d: -f2- | sed 's/^function //')
-
-        # Extract class and method
-        class=""
-        method=""
-        if echo "$sig" | grep -q ':'; then
-            class=$(echo "$sig" | sed 's/:.*//')
-            method=$(echo "$sig" | sed 's/[^:]*:\([A-Za-z_][A-Za-z0-9_]*\).*/\1/')
-        elif echo "$sig" | grep -q '\.'; then
-            class=$(echo "$sig" | sed 's/\..*//')
-            method=$(echo "$sig" | sed 's/[^.]*\.\([A-Za-z_][A-Za-z0-9_]*\).*/\1/')
-        else
-            # Standalone function
-            method=$(echo "$sig" | sed 's/\([A-Za-z_][A-Za-z0-9_]*\).*/\1/')
-        fi
-
-        [ -z "$method" ] && continue
-        echo "$class|$method|$rel:$lineno|$file" >> "$TMPDIR/functions.txt"
-    done
-done < "$TMPDIR/all_lua_files.txt"
 FUNC_COUNT=$(wc -l < "$TMPDIR/functions.txt")
 echo "  Functions found: $FUNC_COUNT"
 
-# --- 1c: source()'d files ---
+# --- 1b: source()'d files ---
 echo -n "" > "$TMPDIR/sourced.txt"
 if [ -f "$MAIN_LUA" ]; then
-    grep 'source(modDirectory' "$MAIN_LUA" | while IFS= read -r line; do
-        rel_path=$(echo "$line" | sed -n 's/.*source(modDirectory \.\. "\([^"]*\)").*/\1/p')
-        [ -z "$rel_path" ] && continue
-        echo "$rel_path" >> "$TMPDIR/sourced.txt"
-    done
+    sed -n 's/.*source(modDirectory \.\. "\([^"]*\)").*/\1/p' "$MAIN_LUA" \
+        | grep -v '^$' > "$TMPDIR/sourced.txt"
 fi
 SOURCED_COUNT=$(wc -l < "$TMPDIR/sourced.txt")
 echo "  source()'d files: $SOURCED_COUNT"
 
-# --- 1d: All Lua files in src/ ---
-find "$MOD_ROOT/src" -name '*.lua' 2>/dev/null | sed "s|$MOD_ROOT/||" | sort > "$TMPDIR/src_files.txt"
+# --- 1c: All Lua files in src/ ---
+# Taken from the walk above rather than traversing src/ a second time
+awk -v root="$MOD_ROOT/" '
+    index($0, root "src/") == 1 { print substr($0, length(root) + 1) }
+' "$TMPDIR/all_lua_files.txt" > "$TMPDIR/src_files.txt"
 SRC_DIR_COUNT=$(wc -l < "$TMPDIR/src_files.txt")
 echo "  Lua files in src/: $SRC_DIR_COUNT"
 
-# --- 1e: Directories in src/ ---
-find "$MOD_ROOT/src" -type d 2>/dev/null | sed "s|$MOD_ROOT/||" | sort > "$TMPDIR/src_dirs.txt"
+# --- 1d: Directories in src/ ---
+find "$MOD_ROOT/src" "${PRUNE[@]}" -type d -print 2>/dev/null | sed "s|$MOD_ROOT/||" | sort > "$TMPDIR/src_dirs.txt"
 
 echo ""
 echo "== Inventory Summary =="
@@ -111,31 +159,99 @@ echo ""
 echo "== PHASE 2: Checking references =="
 echo ""
 
-# Concatenate all lua files into one searchable blob for speed
-cat $(cat "$TMPDIR/all_lua_files.txt") > "$TMPDIR/all_code.txt" 2>/dev/null
+# Single reference sweep: an identifier name can only occur inside one maximal
+# [A-Za-z0-9_] run, so each line is split into its identifier runs and every
+# substring of a run is looked up in the name set (cached per distinct run).
+# The rare name that is not a plain identifier falls back to index() per line.
+# Each file is read once; output is "name|file|lines" for every file that
+# mentions the name, where lines matches what grep -cF would report.
+{
+    cut -d'|' -f1 "$TMPDIR/classes_uniq.txt"
+    cut -d'|' -f2 "$TMPDIR/functions.txt"
+    cut -d'|' -f1 "$TMPDIR/globals.txt"
+} | grep -v '^$' | sort -u > "$TMPDIR/names.txt"
+
+awk '
+    BEGIN { minlen = 1000000; maxlen = 0; nodd = 0 }
+    FILENAME == ARGV[1] {
+        if ($0 !~ /^[A-Za-z0-9_]+$/) { odd[++nodd] = $0; next }
+        want[$0] = 1
+        n = length($0)
+        if (n < minlen) minlen = n
+        if (n > maxlen) maxlen = n
+        next
+    }
+    # Space-separated list of wanted names contained in an identifier run.
+    # Every name is at least minlen long, so a start position whose next
+    # minlen characters are not a name prefix is skipped without trying
+    # each length.
+    function names_in(word,    n, i, len, part, found) {
+        if (word in cache) return cache[word]
+        found = ""
+        n = length(word)
+        for (i = 1; i + minlen - 1 <= n; i++) {
+            if (!(substr(word, i, minlen) in prefix)) continue
+            for (len = minlen; len <= maxlen && i + len - 1 <= n; len++) {
+                part = substr(word, i, len)
+                if (part in want) found = found " " part
+            }
+        }
+        cache[word] = found
+        return found
+    }
+    FNR == 1 { for (name in want) prefix[substr(name, 1, minlen)] = 1 }
+    {
+        file = $0
+        while ((getline line < file) > 0) {
+            split("", inline)
+            for (k = 1; k <= nodd; k++)
+                if (index(line, odd[k])) inline[odd[k]] = 1
+            rest = line
+            while (match(rest, /[A-Za-z0-9_]+/)) {
+                m = split(names_in(substr(rest, RSTART, RLENGTH)), found, " ")
+                rest = substr(rest, RSTART + RLENGTH)
+                for (k = 1; k <= m; k++) inline[found[k]] = 1
+            }
+            for (name in inline) lines[name, file]++
+        }
+        close(file)
+    }
+    END {
+        for (key in lines) {
+            split(key, parts, SUBSEP)
+            print parts[1] "|" parts[2] "|" lines[key]
+        }
+    }
+' "$TMPDIR/names.txt" "$TMPDIR/all_lua_files.txt" > "$TMPDIR/refs.txt"
+
+# Append "|external|self" to each inventory line: the number of files OTHER
+# than the defining file that mention the name, and the number of lines in the
+# defining file that do. Usage: count_refs <inventory> <name_field> <file_field>
+count_refs() {
+    awk -F'|' -v nf="$2" -v ff="$3" '
+        FILENAME == ARGV[1] { files[$1]++; lines[$1, $2] = $3; next }
+        {
+            ext = files[$nf] + 0
+            self = 0
+            if (($nf, $ff) in lines) { ext--; self = lines[$nf, $ff] }
+            print $0 "|" ext "|" self
+        }
+    ' "$TMPDIR/refs.txt" "$1"
+}
 
 TOTAL_ISSUES=0
 
 # --- 2a: Unused Classes ---
 echo "[CLASSES] Checking $CLASS_COUNT classes for external references..."
 echo "---"
-while IFS='|' read -r name location deffile; do
-    # Count references in files OTHER than the defining file
-    ref_count=0
-    while IFS= read -r other; do
-        [ "$other" = "$deffile" ] && continue
-        if grep -q "$name" "$other" 2>/dev/null; then
-            ref_count=$((ref_count + 1))
-            break
-        fi
-    done < "$TMPDIR/all_lua_files.txt"
-
+while IFS='|' read -r name location deffile ref_count _; do
+    # ref_count = files other than the defining file that mention the name
     if [ "$ref_count" -eq 0 ]; then
         echo "  UNUSED CLASS: '$name' defined at $location"
         echo "    -> Never referenced in any other file"
         TOTAL_ISSUES=$((TOTAL_ISSUES + 1))
     fi
-done < "$TMPDIR/classes_uniq.txt"
+done < <(count_refs "$TMPDIR/classes_uniq.txt" 1 3)
 echo ""
 
 # --- 2b: Unused Functions ---
@@ -145,31 +261,25 @@ echo "---"
 # Engine/framework methods that are called implicitly (not by our code)
 SKIP_METHODS="new|update|draw|delete|onCreate|onOpen|onClose|readStream|writeStream|run|getIsAllowed|register|init|cleanup|superClass|loadMap|deleteMap|saveToXMLFile"
 
-while IFS='|' read -r class method location deffile; do
-    # Skip engine callbacks
-    if echo "$method" | grep -qE "^($SKIP_METHODS)$"; then
-        continue
-    fi
-    # Skip XML-bound event handlers (onClick*, onFocus*, onLeave*, onBtn*)
-    case "$method" in
-        onClick*|onFocus*|onLeave*|onBtn*|onClose*|onOpen*|onCreate*) continue ;;
-    esac
-    # Skip very short method names (high false-positive rate)
-    [ ${#method} -lt 4 ] && continue
-
-    # Check for references in OTHER files
-    ext_ref=0
-    while IFS= read -r other; do
-        [ "$other" = "$deffile" ] && continue
-        if grep -q "$method" "$other" 2>/dev/null; then
-            ext_ref=1
-            break
-        fi
-    done < "$TMPDIR/all_lua_files.txt"
+# Functions exempt from the check, filtered in one awk pass: the skip list is
+# split into a lookup set once and the handler prefixes are a literal regex,
+# instead of forking a grep -E per function.
+skip_exempt_functions() {
+    awk -F'|' -v skip="$SKIP_METHODS" '
+        BEGIN { n = split(skip, names, "|"); for (i = 1; i <= n; i++) skipped[names[i]] = 1 }
+        # Skip engine callbacks
+        $2 in skipped { next }
+        # Skip XML-bound event handlers (onClick*, onFocus*, onLeave*, onBtn*)
+        $2 ~ /^on(Click|Focus|Leave|Btn|Close|Open|Create)/ { next }
+        # Skip very short method names (high false-positive rate)
+        length($2) < 4 { next }
+        { print }
+    '
+}
 
-    if [ "$ext_ref" -eq 0 ]; then
-        # Check self-references (more than just the definition line)
-        self_refs=$(grep -c "$method" "$deffile" 2>/dev/null || echo 0)
+while IFS='|' read -r class method location deffile ext_files self_refs; do
+    if [ "$ext_files" -eq 0 ]; then
+        # Self-references: lines in the defining file, including the definition
         if [ "$self_refs" -le 1 ]; then
             status="DEAD"
             detail="defined once, never called (0 external, $self_refs self)"
@@ -181,7 +291,7 @@ while IFS='|' read -r class method location deffile; do
         echo "    -> $detail"
         TOTAL_ISSUES=$((TOTAL_ISSUES + 1))
     fi
-done < "$TMPDIR/functions.txt"
+done < <(count_refs "$TMPDIR/functions.txt" 2 4 | skip_exempt_functions)
 echo ""
 
 # --- 2c: Missing source() targets ---
@@ -228,27 +338,11 @@ echo ""
 # --- 2f: Globals (g_*) defined but never used externally ---
 echo "[GLOBALS] Checking g_* globals for external references..."
 echo "---"
-while IFS= read -r file; do
-    rel=$(echo "$file" | sed "s|$MOD_ROOT/||")
-    grep -n '^g_[A-Za-z0-9_]* *=' "$file" 2>/dev/null | while IFS= read -r line; do
-        name=$(echo "$line" | sed 's/^\([0-9]*\):\(g_[A-Za-z0-9_]*\).*/\2/')
-        lineno=$(echo "$line" | cut -d: -f1)
-        [ -z "$name" ] && continue
-
-        ext_ref=0
-        while IFS= read -r other; do
-            [ "$other" = "$file" ] && continue
-            if grep -q "$name" "$other" 2>/dev/null; then
-                ext_ref=1
-                break
-            fi
-        done < "$TMPDIR/all_lua_files.txt"
-
-        if [ "$ext_ref" -eq 0 ]; then
-            echo "  UNUSED: $rel:$lineno defines '$name' — never referenced elsewhere"
-        fi
-    done
-done < "$TMPDIR/all_lua_files.txt"
+while IFS='|' read -r name location deffile ext_files _; do
+    if [ "$ext_files" -eq 0 ]; then
+        echo "  UNUSED: $location defines '$name' — never referenced elsewhere"
+    fi
+done < <(count_refs "$TMPDIR/globals.txt" 1 3)
 echo ""
 
 # =============================================